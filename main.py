@@ -1,7 +1,92 @@
+import ast
+import math
+import re
+from array import array
+from functools import lru_cache
+
 # Constants
 PI = 3.141592653589793
 E = 2.718281828459045
+LN2 = 0.6931471805599453  # ln(2)
+INV_LN2 = 1.4426950408889634  # 1/ln(2)
+SQRT2 = 1.4142135623730951  # sqrt(2)
 TOLERANCE = 1e-10
+EPSILON = 2.220446049250313e-16  # spacing of doubles at 1.0 (machine epsilon)
+EXPRESSION_CACHE_SIZE = 128  # compiled integrands kept for repeated integrations
+# True swaps the series implementations for Python's math module (libm). The function namespaces are
+# built once at import, so change this here in the source; assigning it at runtime has no effect.
+USE_MATH_MODULE = False
+
+
+def _factorial(n):
+    """
+    Compute n! for a non-negative integer n.
+    Args: n: Non-negative integer.
+    Returns: n! as an integer.
+    """
+    result = 1
+    for k in range(2, n + 1):
+        result *= k
+    return result
+
+
+def _split_exponent(x):
+    """
+    Split a positive finite x into x = m * 2^k with 1 <= m < 2.
+    Only exact scaling by powers of two is used, so m carries all the bits of x.
+    Args: x: Positive finite value.
+    Returns: Tuple (m, k).
+    """
+    m = x
+    k = 0
+    while m >= 2.0 ** 64:  # coarse steps for very large or very small values
+        m *= 2.0 ** -64
+        k += 64
+    while m < 2.0 ** -64:
+        m *= 2.0 ** 64
+        k -= 64
+    while m >= 2.0:
+        m *= 0.5
+        k += 1
+    while m < 1.0:
+        m *= 2.0
+        k -= 1
+    return m, k
+
+
+def _compensated_sum(values):
+    """
+    Sum floating point values with Neumaier's compensated summation.
+    The rounding error of every addition is accumulated separately and added back at the end,
+    so the result does not drift with the number of terms the way a naive running sum does.
+    Used instead of math.fsum, which raises OverflowError when a partial sum overflows, whereas
+    integrands are allowed to produce huge or infinite samples (e.g. tan near its poles).
+    Args: values: Iterable of numbers.
+    Returns: Compensated sum of the values.
+    """
+    total = 0.0
+    compensation = 0.0
+    for value in values:
+        new_total = total + value
+        if abs(total) >= abs(value):
+            compensation += (total - new_total) + value  # low-order bits of value were lost
+        else:
+            compensation += (value - new_total) + total  # low-order bits of total were lost
+        total = new_total
+    if total - total != 0:  # inf or nan: the compensation would only turn inf into nan
+        return total
+    return total + compensation
+
+
+# Taylor coefficient pairs (sin, cos) for the powers of x^2, highest first, for fused Horner evaluation
+_SINCOS_COEFFS = tuple(((-1) ** k / _factorial(2 * k + 1), (-1) ** k / _factorial(2 * k))
+                       for k in range(14, -1, -1))
+_last_sincos = [None, 0.0, 0.0]  # single-slot cache: [x, sin(x), cos(x)] of the most recent angle
+# asin series ratios: term_k = term_(k-1) * x^2 * (2k-1)^2 / ((2k)(2k+1)), for k = 1, 2, ...
+_ASIN_RATIOS = tuple((2 * k - 1) ** 2 / ((2 * k) * (2 * k + 1)) for k in range(1, 200))
+
+
+_IMPLICIT_MULTIPLICATION = re.compile(r"([0-9.)])([A-Za-z(])")  # digit/dot/')' followed by letter/'('
 
 
 def generalize_symbolic_expression(func_str):
@@ -12,15 +97,7 @@ def generalize_symbolic_expression(func_str):
     """
     func_str = handle_absolute_functions(func_str)  # handles functions with absolute value notation
     func_str = func_str.replace("^", "**")
-    computational_expression = []
-    for i in range(len(func_str)):
-        computational_expression.append(func_str[i])
-        if i < len(func_str) - 1:
-            curr = func_str[i]
-            nxt = func_str[i + 1]
-            if (curr.isdigit() or curr == '.' or curr == ')') and (nxt.isalpha() or nxt == '('):
-                computational_expression.append('*')
-    return "".join(computational_expression)
+    return _IMPLICIT_MULTIPLICATION.sub(r"\1*\2", func_str)  # e.g. 2x -> 2*x, (x)(x) -> (x)*(x)
 
 
 def reduce_angle(x):
@@ -29,6 +106,8 @@ def reduce_angle(x):
     Args: x: Angle in radians.
     Returns: Reduced angle in radians.
     """
+    if -PI <= x <= PI:  # already in range, skip the modulo
+        return x
     x = x % (2 * PI)
     if x > PI:
         x -= 2 * PI
@@ -41,36 +120,43 @@ def handle_absolute_functions(expression):
     Args: expression: Input mathematical expression.
     Returns: Expression with Python's abs() absolute value notation.
     """
-    result = []
-    in_abs = False
-    for char in expression:
-        if char == '|':
-            if not in_abs:
-                result.append("abs(")
-                in_abs = True
-            else:
-                result.append(")")
-                in_abs = False
-        else:
-            result.append(char)
-    if in_abs:  # In case of an unmatched '|'
+    parts = expression.split('|')
+    result = [parts[0]]
+    for i, part in enumerate(parts[1:], 1):
+        result.append("abs(" if i % 2 else ")")  # bars alternately open and close abs()
+        result.append(part)
+    if len(parts) % 2 == 0:  # In case of an unmatched '|'
         result.append(")")
     return "".join(result)
 
 
+def _sincos(x):
+    """
+    Compute sin(x) and cos(x) together from one reduced angle using their Taylor series.
+    The last angle is cached, so expressions using both sin and cos at the same x
+    (tan, cot, sin(x) + cos(x), ...) reduce the angle and sum the series only once.
+    Args: x: Angle in radians.
+    Returns: Tuple of approximated (sin(x), cos(x)) values.
+    """
+    if _last_sincos[0] != x:
+        reduced = reduce_angle(x)
+        y = reduced * reduced
+        sin_sum = 0.0
+        cos_sum = 0.0
+        for sin_coeff, cos_coeff in _SINCOS_COEFFS:  # Horner's method on both series at once
+            sin_sum = sin_sum * y + sin_coeff
+            cos_sum = cos_sum * y + cos_coeff
+        _last_sincos[:] = [x, reduced * sin_sum, cos_sum]
+    return _last_sincos[1], _last_sincos[2]
+
+
 def sin(x):
     """
     Compute sin(x) using its Taylor series approximation.
     Args: x: Angle in radians.
     Returns: Approximate sin(x) value.
     """
-    x = reduce_angle(x)
-    term = x
-    sin_x = x
-    for n in range(1, 15):
-        term *= -x * x / ((2 * n) * (2 * n + 1))
-        sin_x += term
-    return sin_x
+    return _sincos(x)[0]
 
 
 def cos(x):
@@ -79,13 +165,19 @@ def cos(x):
     Args: x: Angle in radians.
     Returns:Approximated cos(x) value.
     """
-    x = reduce_angle(x)
-    term = 1.0
-    cos_x = 1.0
-    for n in range(1, 15):
-        term *= -x * x / ((2 * n - 1) * (2 * n))
-        cos_x += term
-    return cos_x
+    return _sincos(x)[1]
+
+
+def tan(x):
+    """
+    Compute tangent ->(sin(x)/cos(x)).
+    Args: x: Angle in radians.
+    Returns: Approximated tan(x) value or infinity if undefined.
+    """
+    sin_x, cos_x = _sincos(x)
+    if abs(cos_x) <= TOLERANCE:
+        return float('inf')
+    return sin_x / cos_x
 
 
 def sec(x):
@@ -94,7 +186,7 @@ def sec(x):
     Args: x: Angle in radians.
     Returns: Approximated sec(x) value or infinity if undefined.
     """
-    cos_x = cos(x)
+    cos_x = _sincos(x)[1]
     if abs(cos_x) < TOLERANCE:
         return float('inf')
     return 1 / cos_x
@@ -106,7 +198,7 @@ def cosec(x):
     Args: x: Angle in radians.
     Returns: Approximated cosec(x) value or infinity if undefined.
     """
-    sin_x = sin(x)
+    sin_x = _sincos(x)[0]
     if abs(sin_x) < TOLERANCE:
         return float('inf')
     return 1 / sin_x
@@ -118,16 +210,18 @@ def cot(x):
     Args: x: Angle in radians.
     Returns: Approximated cot(x) value or infinity if undefined.
     """
-    sin_x = sin(x)
+    sin_x, cos_x = _sincos(x)
     if abs(sin_x) < TOLERANCE:
         return float('inf')
-    return cos(x) / sin_x
+    return cos_x / sin_x
 
 
 def log(x, max_iterations=100):
     """
     Compute the natural logarithm using a series expansion transformation.
-    ln(x) = 2 * (u + u^3/3 + u^5/5 + ...), where u = (x - 1)/(x + 1)
+    x is first reduced to x = m * 2^k with 1/sqrt(2) <= m < sqrt(2), so that
+    ln(x) = k * ln(2) + ln(m) and ln(m) = 2 * (u + u^3/3 + u^5/5 + ...), where u = (m - 1)/(m + 1)
+    and |u| <= 0.172, which converges in a handful of terms.
 
     Args:
         x: Value for which logarithm is computed.
@@ -139,7 +233,13 @@ def log(x, max_iterations=100):
     """
     if x <= 0:
         raise ValueError("Logarithm undefined for non-positive values.")
-    u = (x - 1) / (x + 1)
+    if x == float('inf'):
+        return x
+    m, k = _split_exponent(x)
+    if m >= SQRT2:  # move m from [1, 2) into [1/sqrt(2), sqrt(2))
+        m *= 0.5
+        k += 1
+    u = (m - 1) / (m + 1)
     result = u
     u_power = u
     n = 1
@@ -147,33 +247,49 @@ def log(x, max_iterations=100):
         n += 2
         u_power *= u * u
         term = u_power / n
-        if abs(term) < TOLERANCE:
+        if result + term == result:  # term no longer changes the sum at double precision
             break
         result += term
-    return 2 * result
+    return k * LN2 + 2 * result
 
 
 def exponential(x, terms=50):
     """
     Compute the exponential function e^x using Taylor series.
+    The argument is first reduced as e^x = 2^k * e^r with k = round(x/ln2) and |r| <= ln2/2,
+    so the series only has to converge for small r.
     Args:
         x: Power to which e is raised.
-        terms: Number of terms in the series.
+        terms: Maximum number of terms in the series.
     
     Returns:
         Approximated e^x value.
     """
+    if x != x or x == float('inf'):  # nan and +inf pass through, as e^x of them is themselves
+        return x
+    if x == float('-inf'):
+        return 0.0
+    k = int(round(x * INV_LN2))
+    if k > 1024:  # beyond the largest representable double
+        return float('inf')
+    if k < -1100:  # below the smallest subnormal double
+        return 0.0
+    r = x - k * LN2
     result = 1.0
     term = 1.0
     for n in range(1, terms):
-        term *= x / n
+        term *= r / n
+        if result + term == result:  # term no longer changes the sum at double precision
+            break
         result += term
-    return result
+    return result * 2.0 ** (k - 1) * 2.0  # split the scaling so k = 1024 does not overflow 2.0 ** k
 
 
 def sqrt(x, max_iterations=100):
     """
     Compute the square root of x using Newton-Raphson method.
+    x is first split as m * 2^k with k even and 1 <= m < 4, so that sqrt(x) = sqrt(m) * 2^(k/2)
+    and the iteration always starts close to the root.
     Args:
         x: Non-negative value.
         max_iterations: Maximum iterations for convergence.
@@ -186,16 +302,23 @@ def sqrt(x, max_iterations=100):
         raise ValueError("Cannot compute square root of a negative number.")
     if x == 0:
         return 0.0
-    # Choose an initial guess: if x is 1 or greater, use x; otherwise, use 1.0 (for 0 < x < 1)
-    guess = x if x >= 1 else 1.0
+    if x == float('inf'):
+        return x
+    m, k = _split_exponent(x)
+    if k % 2:  # make the exponent even so it halves exactly
+        m *= 2.0
+        k -= 1
+    scale = 2.0 ** (k // 2)
+    # Initial guess: the chord of sqrt over [1, 4] stays within 6% of the root
+    guess = (m + 2) / 3
     # Iterate using the Newton-Raphson method
     for _ in range(max_iterations):
-        new_guess = (guess + x / guess) / 2  # Compute a new approximation using the formula
+        new_guess = (guess + m / guess) / 2  # Compute a new approximation using the formula
         # Check for convergence: if the improvement is smaller than the tolerance, return the current estimate
         if abs(new_guess - guess) < TOLERANCE:
-            return new_guess
+            return new_guess * scale
         guess = new_guess  # Update the guess for the next iteration
-    return guess
+    return guess * scale
 
 
 def arc_sin(x, max_iterations=50):
@@ -203,23 +326,24 @@ def arc_sin(x, max_iterations=50):
     Compute sin^-1(x) using its Taylor series approximation.
     Args:
         x: Input value in the domain [-1, 1].
-        max_iterations: Maximum iterations for convergence.
+        max_iterations: Maximum iterations for convergence (at most 200).
     Returns:
         Approximated sin^-1(x) value in radians.
     Raises:
-        ValueError: If |x| > 1.
+        ValueError: If |x| > 1 or max_iterations exceeds 200.
     """
     if x < -1 or x > 1:
         raise ValueError("asin(x) undefined for |x| > 1.")
+    if max_iterations > len(_ASIN_RATIOS) + 1:
+        raise ValueError("asin(x) supports at most {} iterations.".format(len(_ASIN_RATIOS) + 1))
+    x_squared = x * x
     result = x
     term = x
-    iteration = 1
-    while iteration < max_iterations:
-        term *= ((2 * iteration - 1) ** 2 * x * x) / ((2 * iteration) * (2 * iteration + 1))  # Taylor series expansion
+    for ratio in _ASIN_RATIOS[:max(max_iterations - 1, 0)]:
+        term *= ratio * x_squared  # Taylor series expansion
         result += term
         if abs(term) < TOLERANCE:
             break
-        iteration += 1
     return result
 
 
@@ -237,9 +361,12 @@ def arc_tan(x, max_iterations=100):
             return PI / 2 - arc_tan(1 / x, max_iterations)  # For positive x, compute via complementary angle
         else:
             return -PI / 2 - arc_tan(1 / x, max_iterations)  # For negative x, adjust sign accordingly
-    result = 0.0  # Initialize the result for the Taylor series
-    for n in range(max_iterations):
-        term = ((-1) ** n) * (x ** (2 * n + 1)) / (2 * n + 1)  # Calculate the nth term of the series
+    x_squared = x * x
+    power = x  # signed power (-1)^n * x^(2n+1), updated incrementally
+    result = x  # Initialize the result with the first term of the Taylor series
+    for n in range(1, max_iterations):
+        power *= -x_squared
+        term = power / (2 * n + 1)  # Calculate the nth term of the series
         result += term  # Add the term to the result
         if abs(term) < TOLERANCE:
             break  # Stop if the term is small enough for convergence
@@ -262,16 +389,76 @@ def arc_cos(x, max_iterations=50):
     return PI / 2 - arc_sin(x, max_iterations)
 
 
+def _math_tan(x):
+    """
+    Compute tan(x) with the math module, returning infinity at the poles like tan().
+    Args: x: Angle in radians.
+    Returns: tan(x) value or infinity if undefined.
+    """
+    cos_x = math.cos(x)
+    if abs(cos_x) <= TOLERANCE:
+        return float('inf')
+    return math.sin(x) / cos_x
+
+
+def _math_sec(x):
+    """
+    Compute sec(x) with the math module, returning infinity at the poles like sec().
+    Args: x: Angle in radians.
+    Returns: sec(x) value or infinity if undefined.
+    """
+    cos_x = math.cos(x)
+    if abs(cos_x) < TOLERANCE:
+        return float('inf')
+    return 1 / cos_x
+
+
+def _math_cosec(x):
+    """
+    Compute cosec(x) with the math module, returning infinity at the poles like cosec().
+    Args: x: Angle in radians.
+    Returns: cosec(x) value or infinity if undefined.
+    """
+    sin_x = math.sin(x)
+    if abs(sin_x) < TOLERANCE:
+        return float('inf')
+    return 1 / sin_x
+
+
+def _math_cot(x):
+    """
+    Compute cot(x) with the math module, returning infinity at the poles like cot().
+    Args: x: Angle in radians.
+    Returns: cot(x) value or infinity if undefined.
+    """
+    sin_x = math.sin(x)
+    if abs(sin_x) < TOLERANCE:
+        return float('inf')
+    return math.cos(x) / sin_x
+
+
+def _math_exp(x):
+    """
+    Compute e^x with the math module, overflowing to infinity like exponential().
+    Args: x: Power to which e is raised.
+    Returns: e^x value.
+    """
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return float('inf')
+
+
 def get_custom_functions():
     """
     Returns a dictionary of function names and corresponding functions for use in the evaluation function.
     Returns:
         A dictionary with customized functions.
     """
-    return {
+    functions = {
         "sin": sin,
         "cos": cos,
-        "tan": lambda x: sin(x) / cos(x) if abs(cos(x)) > TOLERANCE else float('inf'),
+        "tan": tan,
         "sec": sec,
         "cosec": cosec,
         "csc": cosec,
@@ -287,6 +474,62 @@ def get_custom_functions():
         "e": E,
         "abs": abs,
         }
+    if USE_MATH_MODULE:
+        functions.update({
+            "sin": math.sin,
+            "cos": math.cos,
+            "tan": _math_tan,
+            "sec": _math_sec,
+            "cosec": _math_cosec,
+            "csc": _math_cosec,
+            "cot": _math_cot,
+            "asin": math.asin,
+            "acos": math.acos,
+            "atan": math.atan,
+            "sqrt": math.sqrt,
+            "log": math.log,
+            "ln": math.log,
+            "exp": _math_exp,
+            })
+    return functions
+
+
+_CUSTOM_FUNCTIONS = get_custom_functions()  # built once, shared by every compiled integrand
+_EVALUATION_NAMESPACE = _CUSTOM_FUNCTIONS.copy()  # reused by evaluate_function, which rebinds "x" per call
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_function(func_str):
+    """
+    Compile the generalized function string once into a Python function of x.
+    The parsed expression is wrapped in a `lambda x: ...` node before compiling, so evaluating
+    a sample point is a plain function call with x as a fast local instead of an eval() per point.
+    Args: func_str: generalized function from a symbolic expression string representing f(x).
+    Returns: A function f(x) evaluating the compiled expression.
+    Raises:
+        ValueError: If the expression cannot be parsed.
+    """
+    try:
+        tree = ast.parse(func_str, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError("Invalid function expression '{}': {}".format(func_str, exc))
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg="x")], vararg=None, kwonlyargs=[],
+                              kw_defaults=[], kwarg=None, defaults=[])
+    function_tree = ast.Expression(body=ast.Lambda(args=arguments, body=tree.body))
+    code = compile(ast.fix_missing_locations(function_tree), "<f>", "eval")
+    return eval(code, _CUSTOM_FUNCTIONS.copy())
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(raw_function):
+    """
+    Generalize and compile a user expression, reusing the result for repeated expressions.
+    Args: raw_function: Functional expression as entered by the user.
+    Returns: A function f(x) evaluating the expression.
+    Raises:
+        ValueError: If the expression cannot be parsed.
+    """
+    return compile_function(generalize_symbolic_expression(raw_function))
 
 
 def evaluate_function(func_str, x_value):
@@ -301,18 +544,33 @@ def evaluate_function(func_str, x_value):
         ValueError: If evaluation fails.
     """
     try:
-        custom_functions = get_custom_functions()
-        custom_functions["x"] = x_value  # set function value for x
-        return eval(func_str, custom_functions)
+        _EVALUATION_NAMESPACE["x"] = x_value  # set function value for x
+        return eval(func_str, _EVALUATION_NAMESPACE)
     except Exception as exc:
         raise ValueError("Error evaluating function at x={}: {}".format(x_value, exc))
 
 
+def _reporting_errors(f):
+    """
+    Wrap a compiled integrand so evaluation errors report the x at which they happened.
+    Args: f: Compiled integrand.
+    Returns: A function g(x) returning float(f(x)).
+    Raises:
+        ValueError: From g, if f fails or returns a non-real value at x.
+    """
+    def g(x):
+        try:
+            return float(f(x))
+        except Exception as exc:
+            raise ValueError("Error evaluating function at x={}: {}".format(x, exc))
+    return g
+
+
 def simpsons_rule(func_str, a, b, subdivisions=100):
     """
     Compute the definite integral of f(x) from a to b using Simpson's Rule.
     Args:
-        func_str: Generalized function string representing f(x).
+        func_str: Generalized function string representing f(x), or an already compiled f(x).
         a: Lower limit of integration.
         b: Upper limit of integration.
         subdivisions: Number of subdivisions (must be even)
@@ -321,15 +579,136 @@ def simpsons_rule(func_str, a, b, subdivisions=100):
     """
     if subdivisions % 2 != 0:
         subdivisions += 1  # make even in case of odd input
+    f = func_str if callable(func_str) else compile_function(func_str)  # compiled once, not per sample point
     h = (b - a) / subdivisions  # step size
-    total = evaluate_function(func_str, a) + evaluate_function(func_str, b)  # endpoints
-    for i in range(1, subdivisions):
-        x = a + i * h  # current x
-        weight = 4 if i % 2 != 0 else 2  # Simpson weight
-        total += weight * evaluate_function(func_str, x)  # accumulate weighted value
+    x_values = array('d', (a + i * h for i in range(subdivisions)))  # contiguous buffer of sample points
+    x_values.append(b)  # exact endpoint b
+    try:
+        y_values = array('d', map(f, x_values))
+    except Exception:
+        # sample again point by point, only on failure, to report the x that failed
+        y_values = array('d', map(_reporting_errors(f), x_values))
+    odd_sum = _compensated_sum(y_values[1:-1:2])  # weight 4
+    even_sum = _compensated_sum(y_values[2:-1:2])  # interior, weight 2
+    # the weights are powers of two, so applying them to the sums is exact
+    total = _compensated_sum([y_values[0], y_values[-1], 4 * odd_sum, 2 * even_sum])
     return (h / 3) * total  # Simpson's rule result
 
 
+def _adaptive_simpson(f, a, b, fa, fm, fb, whole, tolerance, depth, floor, budget):
+    """
+    Recursively refine Simpson's rule on [a, b] until the Richardson error estimate meets the tolerance.
+    Args:
+        f: Compiled integrand.
+        a: Left end of the panel.
+        b: Right end of the panel.
+        fa, fm, fb: f evaluated at a, the midpoint and b.
+        whole: Simpson estimate over the whole panel.
+        tolerance: Allowed absolute error on this panel.
+        depth: Remaining number of halvings allowed.
+        floor: Absolute tolerance below which rounding error dominates and refining stops.
+        budget: Single-item list holding the number of function evaluations still allowed.
+    Returns:
+        Tuple (integral over [a, b], estimated absolute error of it).
+    """
+    m = (a + b) / 2
+    lm = (a + m) / 2
+    rm = (m + b) / 2
+    flm = f(lm)
+    frm = f(rm)
+    budget[0] -= 2
+    left = (m - a) / 6 * (fa + 4 * flm + fm)
+    right = (b - m) / 6 * (fm + 4 * frm + fb)
+    delta = left + right - whole
+    if delta != delta or abs(delta) == float('inf'):  # infinite samples, refining cannot help
+        return left + right, 0.0
+    if (abs(delta) <= 15 * tolerance  # converged
+            or abs(delta) <= 64 * EPSILON * (abs(left) + abs(right))  # delta is only rounding noise
+            or tolerance <= floor or depth <= 0 or budget[0] <= 0):  # cannot refine further
+        return left + right + delta / 15, abs(delta) / 15  # Richardson extrapolation
+    left_value, left_error = _adaptive_simpson(f, a, m, fa, flm, fm, left, tolerance / 2, depth - 1,
+                                               floor, budget)
+    right_value, right_error = _adaptive_simpson(f, m, b, fm, frm, fb, right, tolerance / 2, depth - 1,
+                                                 floor, budget)
+    return left_value + right_value, left_error + right_error
+
+
+def adaptive_simpsons_rule(func_str, a, b, tolerance=1e-7, max_depth=30, min_depth=3, max_evaluations=100000,
+                           full_output=False):
+    """
+    Compute the definite integral of f(x) from a to b using adaptive Simpson's Rule.
+    [a, b] is first split into 2^min_depth panels, so periodic integrands cannot fool the estimate
+    by vanishing at the first few sample points. Panels are then halved only where the error estimate
+    |S(left) + S(right) - S(whole)| / 15 exceeds their share of the tolerance, so smooth regions use
+    few evaluations and rough regions get more.
+    The target error is tolerance * max(|I|, 1): absolute for integrals up to 1 in size, which matches
+    the six decimals the CLI prints, and relative for larger ones.
+    Args:
+        func_str: Generalized function string representing f(x), or an already compiled f(x).
+        a: Lower limit of integration.
+        b: Upper limit of integration.
+        tolerance: Target error of the integral, relative to max(|I|, 1).
+        max_depth: Maximum number of times a panel may be halved, including the initial split.
+        min_depth: Number of halvings always performed.
+        max_evaluations: Evaluation budget, shared out across the panels.
+        full_output: If True, also return whether the target error was met.
+    Returns:
+        Approximated definite integral, or a tuple (integral, converged) if full_output is True.
+        converged is False when the summed error estimate of the panels exceeds the target error,
+        i.e. max_depth, max_evaluations or rounding stopped the refinement first.
+    """
+    f = func_str if callable(func_str) else compile_function(func_str)  # compiled once, not per sample point
+    f = _reporting_errors(f)
+    panels = 2 ** min_depth
+    h = (b - a) / (2 * panels)  # spacing of the initial sample points
+    x_values = [a + i * h for i in range(2 * panels)] + [b]
+    y_values = [f(x) for x in x_values]
+    wholes = [(x_values[2 * i + 2] - x_values[2 * i]) / 6 *
+              (y_values[2 * i] + 4 * y_values[2 * i + 1] + y_values[2 * i + 2]) for i in range(panels)]
+    remaining = max_evaluations - len(y_values)
+    result = _compensated_sum(wholes)  # coarse estimate, only used to pick the first scale
+    scale = None
+    while True:
+        # The coarse estimate can overshoot |I| badly on peaked integrands, which would loosen the
+        # tolerance by the same factor, so refine again whenever the result shows the scale was too large.
+        new_scale = max(abs(result), 1.0) if result == result else float('inf')  # nan: infinite samples
+        if scale is not None and new_scale >= scale / 2:
+            break
+        if scale is not None and remaining < 2 * panels:  # no budget left to refine with the corrected scale
+            converged = False
+            break
+        scale = new_scale
+        values = list(wholes)
+        errors = [float('inf')] * panels
+        panel_tolerance = tolerance * scale / panels
+        pending = list(range(panels))
+        # Each pending panel gets an even share of the budget that is left, so a hard region cannot
+        # starve the panels after it. Panels that run out are retried once with what the others left over.
+        for _ in range(2):
+            unconverged = []
+            for n, i in enumerate(pending):
+                panel_budget = [remaining // (len(pending) - n)]
+                if panel_budget[0] < 2:
+                    unconverged.append(i)
+                    continue
+                allowed = panel_budget[0]
+                values[i], errors[i] = _adaptive_simpson(
+                    f, x_values[2 * i], x_values[2 * i + 2], y_values[2 * i], y_values[2 * i + 1],
+                    y_values[2 * i + 2], wholes[i], panel_tolerance, max_depth - min_depth,
+                    EPSILON * scale, panel_budget)
+                remaining -= allowed - panel_budget[0]
+                if errors[i] > panel_tolerance:
+                    unconverged.append(i)
+            if not unconverged or remaining < 2 * len(unconverged):
+                break
+            pending = unconverged
+        converged = _compensated_sum(errors) <= tolerance * scale
+        result = _compensated_sum(values)
+    if full_output:
+        return result, converged
+    return result
+
+
 def main():
     print("Simpson's Rule Numerical Integration")
     print("-----------------------------------")
@@ -343,10 +722,12 @@ def main():
         print("Invalid number. Please enter numeric values for the limits.")
         return
 
-    generalized_function = generalize_symbolic_expression(raw_function)
     try:
-        result = simpsons_rule(generalized_function, a, b)
+        result, converged = adaptive_simpsons_rule(compile_expression(raw_function), a, b, full_output=True)
         print("\nThe approximate integral of f(x) from {} to {} is: {:.6f}".format(a, b, result))
+        if not converged:
+            print("Warning: the evaluation limit was reached before the requested accuracy; "
+                  "the result may be inaccurate.")
     except Exception as err:
         print("\nAn error occurred: {}".format(err))
 